@@ -3,31 +3,84 @@ import re
 import sys
 import json
 import time
+import queue
+import threading
+import sqlite3
 import requests
-from bs4 import BeautifulSoup
-import ffmpeg
-from pydub import AudioSegment
-import whisper
+import numpy as np
+import orjson
+import ctranslate2
+from faster_whisper import WhisperModel, BatchedInferencePipeline, decode_audio
 from tqdm import tqdm
 from typing import List, Dict
+from contextlib import closing
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 class BiliDown2Text:
-    # 用于提取页面中的__INITIAL_STATE__数据的正则表达式
-    INITIAL_STATE_PATTERN = r'window\.__INITIAL_STATE__=([\s|\S]+);\(function'
+    # 页面中__INITIAL_STATE__数据的起止标记
+    INITIAL_STATE_PREFIX = 'window.__INITIAL_STATE__='
+    INITIAL_STATE_SUFFIX = ';(function'
     # 用于提取视频ID的正则表达式
-    AV_PATTERN = r'av(\d+)'
-    BV_PATTERN = r'BV([a-zA-Z0-9]+)'
+    AV_PATTERN = re.compile(r'av(\d+)', re.I)
+    BV_PATTERN = re.compile(r'BV([a-zA-Z0-9]+)')
+    # 贪心解码：单束、温度固定为0，不做回退重试
+    DECODE_OPTIONS = {'beam_size': 1, 'best_of': 1, 'temperature': 0.0}
 
     @staticmethod
     def is_cuda_available():
-        return whisper.torch.cuda.is_available()
+        return ctranslate2.get_cuda_device_count() > 0
 
-    def __init__(self, model_size='small'):
-        self.model = whisper.load_model(model_size, device="cuda" if self.is_cuda_available() else "cpu")
+    def __init__(self, model_size='large-v3-turbo', batch_size=16):
+        # GPU上使用int8权重+fp16计算，CPU上使用int8量化
+        if self.is_cuda_available():
+            # 每张GPU加载一份模型副本（num_workers保持默认1，即每张卡一个工作线程），
+            # 多个线程并发转写时分别在不同GPU上推理
+            gpu_count = ctranslate2.get_cuda_device_count()
+            self.model = WhisperModel(model_size, device="cuda", device_index=list(range(gpu_count)),
+                                      compute_type="int8_float16")
+            self.num_workers = gpu_count
+        else:
+            self.model = WhisperModel(model_size, device="cpu", compute_type="int8")
+            self.num_workers = 1
+        # 批量推理管线，一次前向处理多个语音片段
+        self.pipeline = BatchedInferencePipeline(model=self.model)
+        self.batch_size = batch_size
+        self._warmed_up = False
         self.base_dir = 'bilibili_video'
         self.config = self.load_config()
+        self.session = self.create_session()
+        self._collection_cache = {}
         self.setup_directories()
 
+    def warmup(self):
+        """用一整批静音走一遍与正式转写相同的批量管线，让首次内核选择和显存分配发生在处理视频之前"""
+        # 仅GPU需要预热；CPU上没有内核选择可摊销，反而白白推理数分钟静音
+        if self._warmed_up or not self.is_cuda_available():
+            return
+        self._warmed_up = True
+        # batch_size个30秒窗口，凑满一个批次
+        silence = np.zeros(16000 * 30 * self.batch_size, dtype=np.float32)
+        # 关闭VAD，否则静音会被整段过滤掉而不经过模型，改为显式指定各窗口的起止时间（秒）
+        clip_timestamps = [{'start': i * 30, 'end': (i + 1) * 30} for i in range(self.batch_size)]
+
+        def run(_):
+            pipeline = BatchedInferencePipeline(model=self.model)
+            segments, _ = pipeline.transcribe(
+                silence,
+                initial_prompt="以下是普通话的句子。",
+                batch_size=self.batch_size,
+                vad_filter=False,
+                clip_timestamps=clip_timestamps,
+                **self.DECODE_OPTIONS,
+            )
+            # segments为生成器，需消费后才会真正推理
+            list(segments)
+
+        # 并发调用，使每张GPU上的模型副本都完成预热
+        with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+            list(pool.map(run, range(self.num_workers)))
+
     def load_config(self):
         """加载配置文件"""
         config_path = 'config.json'
@@ -39,6 +92,13 @@ class BiliDown2Text:
                 print(f'加载配置文件失败: {str(e)}')
         return {'bilibili': {'cookies': {}, 'headers': {}}}
 
+    def create_session(self):
+        """创建复用TCP/TLS连接的会话，统一携带headers和cookies"""
+        session = requests.Session()
+        session.headers.update(self.config['bilibili']['headers'])
+        session.cookies.update(self.config['bilibili']['cookies'])
+        return session
+
     def setup_directories(self):
         """创建基础目录"""
         if not os.path.exists(self.base_dir):
@@ -47,31 +107,61 @@ class BiliDown2Text:
     @staticmethod
     def get_initial_state(html_content: str) -> str:
         """从HTML内容中提取__INITIAL_STATE__数据"""
-        match = re.search(BiliDown2Text.INITIAL_STATE_PATTERN, html_content)
-        if not match:
+        start = html_content.find(BiliDown2Text.INITIAL_STATE_PREFIX)
+        if start == -1:
             return ''
-        return match.group(1)
+        start += len(BiliDown2Text.INITIAL_STATE_PREFIX)
+        end = html_content.find(BiliDown2Text.INITIAL_STATE_SUFFIX, start)
+        if end == -1:
+            return ''
+        return html_content[start:end]
+
+    @staticmethod
+    def _read_until_initial_state(chunks) -> str:
+        """逐块读取页面，读到__INITIAL_STATE__结束标记为止；每块只扫描新增内容及与上一块衔接的部分"""
+        prefix = BiliDown2Text.INITIAL_STATE_PREFIX
+        suffix = BiliDown2Text.INITIAL_STATE_SUFFIX
+        overlap = max(len(prefix), len(suffix)) - 1
+        parts = []
+        size = 0
+        tail = ''
+        state_start = -1  # __INITIAL_STATE__数据在整个页面中的起始位置
+        for chunk in chunks:
+            window = tail + chunk
+            window_offset = size - len(tail)
+            parts.append(chunk)
+            size += len(chunk)
+            if state_start == -1:
+                index = window.find(prefix)
+                if index != -1:
+                    state_start = window_offset + index + len(prefix)
+            if state_start != -1 and window.find(suffix, max(0, state_start - window_offset)) != -1:
+                break
+            tail = window[-overlap:]
+        return ''.join(parts)
 
     def check_collection(self, url: str) -> tuple[bool, dict]:
         """检查视频是否为合集，返回(是否合集, 视频数据)的元组"""
+        # 同一链接只请求和解析一次页面
+        if url in self._collection_cache:
+            return self._collection_cache[url]
         try:
-            headers = self.config['bilibili']['headers']
-            cookies = self.config['bilibili']['cookies']
-            response = requests.get(url, headers=headers, cookies=cookies)
-            response.raise_for_status()
-
-            html_content = response.text
+            # 流式读取页面，拿到完整的__INITIAL_STATE__后即停止下载剩余内容
+            with self.session.get(url, stream=True) as response:
+                response.raise_for_status()
+                response.encoding = response.encoding or 'utf-8'
+                html_content = self._read_until_initial_state(
+                    response.iter_content(chunk_size=65536, decode_unicode=True))
             initial_state = self.get_initial_state(html_content)
             if not initial_state:
                 return False, {}
 
             try:
-                data = json.loads(initial_state)
+                data = orjson.loads(initial_state)
                 video_data = data.get('videoData', {})
                 ugc_season = video_data.get('ugc_season')
-                if ugc_season:
-                    return True, data
-                return False, data
+                self._collection_cache[url] = (bool(ugc_season), data)
+                return self._collection_cache[url]
             except json.JSONDecodeError:
                 print('解析页面数据失败')
                 return False, {}
@@ -80,24 +170,46 @@ class BiliDown2Text:
             print(f'检查合集状态时发生错误: {str(e)}')
             return False, {}
 
+    def _connect_progress(self) -> sqlite3.Connection:
+        """打开进度数据库，首次使用时建表"""
+        conn = sqlite3.connect(os.path.join(self.base_dir, 'progress.db'))
+        conn.execute('CREATE TABLE IF NOT EXISTS done (collection TEXT, bvid TEXT, PRIMARY KEY (collection, bvid))')
+        return conn
+
     def _load_progress(self, collection_id: str) -> set:
         """加载下载进度"""
-        progress_file = os.path.join(self.base_dir, f'progress_{collection_id}.json')
-        if os.path.exists(progress_file):
-            try:
-                with open(progress_file, 'r', encoding='utf-8') as f:
-                    return set(json.load(f))
-            except Exception as e:
-                print(f'加载进度文件失败: {str(e)}')
+        try:
+            with closing(self._connect_progress()) as conn:
+                rows = conn.execute('SELECT bvid FROM done WHERE collection = ?', (collection_id,)).fetchall()
+                if not rows:
+                    return self._import_legacy_progress(conn, collection_id)
+            return {row[0] for row in rows}
+        except sqlite3.Error as e:
+            print(f'加载进度文件失败: {str(e)}')
         return set()
 
-    def _save_progress(self, collection_id: str, downloaded_videos: set) -> None:
-        """保存下载进度"""
+    def _import_legacy_progress(self, conn: sqlite3.Connection, collection_id: str) -> set:
+        """将旧版progress_{合集ID}.json中的进度一次性导入数据库"""
         progress_file = os.path.join(self.base_dir, f'progress_{collection_id}.json')
+        if not os.path.exists(progress_file):
+            return set()
         try:
-            with open(progress_file, 'w', encoding='utf-8') as f:
-                json.dump(list(downloaded_videos), f)
+            with open(progress_file, 'r', encoding='utf-8') as f:
+                bvids = set(json.load(f))
         except Exception as e:
+            print(f'加载进度文件失败: {str(e)}')
+            return set()
+        with conn:
+            conn.executemany('INSERT OR IGNORE INTO done (collection, bvid) VALUES (?, ?)',
+                             [(collection_id, bvid) for bvid in bvids])
+        return bvids
+
+    def _save_progress(self, collection_id: str, bvid: str) -> None:
+        """记录单个视频的完成进度，只写入一行"""
+        try:
+            with closing(self._connect_progress()) as conn, conn:
+                conn.execute('INSERT OR IGNORE INTO done (collection, bvid) VALUES (?, ?)', (collection_id, bvid))
+        except sqlite3.Error as e:
             print(f'保存进度文件失败: {str(e)}')
 
     def process_collection(self, data: dict) -> List[Dict]:
@@ -110,29 +222,45 @@ class BiliDown2Text:
         # 加载已下载的视频记录
         downloaded_videos = self._load_progress(collection_id)
 
+        # 一次遍历构建分集列表，显示和各下载选项共用
+        grouped_videos = []
+        for section in sections:
+            section_videos = []
+            for episode in section.get('episodes', []):
+                bvid = episode.get('bvid', '')
+                if not bvid:
+                    continue
+                title = episode.get('title', '未知标题')
+                long_title = episode.get('long_title', '')
+                if long_title:
+                    title = f'{title} - {long_title}'
+                section_videos.append({
+                    'title': title,
+                    'bvid': bvid,
+                    'aid': episode.get('aid')
+                })
+            grouped_videos.append((section, section_videos))
+        all_videos = [video for _, section_videos in grouped_videos for video in section_videos]
+        # 序号和BV号到视频的映射表
+        video_map = {str(index): video for index, video in enumerate(all_videos, 1)}
+        video_map.update({video['bvid']: video for video in all_videos})
+
         # 显示合集信息
         print('\n' + '='*50)
         print('检测到视频合集')
         print('='*50)
         print(f'合集标题：{ugc_season.get("title", "未知标题")}')
-        total_episodes = sum(len(section.get('episodes', [])) for section in sections)
-        print(f'合集总集数：{total_episodes}')
+        print(f'合集总集数：{len(all_videos)}')
         print('-'*50 + '\n')
 
         # 显示分集信息
         video_index = 1  # 添加序号计数
-        for section_index, section in enumerate(sections, 1):
+        for section_index, (section, section_videos) in enumerate(grouped_videos, 1):
             if len(sections) > 1:
-                print(f'第{section_index}部分：{section.get("title", "未命名部分")}')                
+                print(f'第{section_index}部分：{section.get("title", "未命名部分")}')
                 print('-'*30)
-            episodes = section.get('episodes', [])
-            for episode in episodes:
-                title = episode.get('title', '未知标题')
-                long_title = episode.get('long_title', '')
-                bvid = episode.get('bvid', '')
-                if long_title:
-                    title = f'{title} - {long_title}'
-                print(f'[{video_index}] [{bvid}] {title}')
+            for video in section_videos:
+                print(f'[{video_index}] [{video["bvid"]}] {video["title"]}')
                 video_index += 1
             if len(sections) > 1:
                 print()
@@ -148,49 +276,17 @@ class BiliDown2Text:
         selected_videos = []
         if choice == '1':
             # 下载整个合集
-            for section in sections:
-                for episode in section.get('episodes', []):
-                    bvid = episode.get('bvid', '')
-                    if bvid in downloaded_videos:
-                        print(f'跳过已下载的视频：{bvid}')
-                        continue
-                    
-                    title = episode.get('title', '未知标题')
-                    long_title = episode.get('long_title', '')
-                    if long_title:
-                        title = f'{title} - {long_title}'
-                    if bvid:
-                        selected_videos.append({
-                            'title': title,
-                            'bvid': bvid,
-                            'aid': episode.get('aid')
-                        })
+            for video in all_videos:
+                if video['bvid'] in downloaded_videos:
+                    print(f'跳过已下载的视频：{video["bvid"]}')
+                    continue
+                selected_videos.append(video)
         elif choice == '2':
             # 选择特定视频
             print('\n请输入要下载的视频序号或BV号（多个用逗号分隔）：')
             selection = input('> ').strip().replace('，', ',')
             selected_bvids = [x.strip() for x in selection.split(',') if x.strip()]
 
-            # 构建视频映射表
-            video_map = {}
-            index = 1
-            for section in sections:
-                for episode in section.get('episodes', []):
-                    bvid = episode.get('bvid', '')
-                    title = episode.get('title', '未知标题')
-                    long_title = episode.get('long_title', '')
-                    if long_title:
-                        title = f'{title} - {long_title}'
-                    if bvid:
-                        video_info = {
-                            'title': title,
-                            'bvid': bvid,
-                            'aid': episode.get('aid')
-                        }
-                        video_map[str(index)] = video_info
-                        video_map[bvid] = video_info
-                        index += 1
-
             for selection in selected_bvids:
                 if selection in video_map:
                     selected_videos.append(video_map[selection])
@@ -199,26 +295,9 @@ class BiliDown2Text:
             print('\n请输入下载区间的起始和结束序号（如：1,10）：')
             try:
                 start, end = map(int, input('> ').strip().split(','))
-                # 构建视频列表
-                all_videos = []
-                for section in sections:
-                    for episode in section.get('episodes', []):
-                        bvid = episode.get('bvid', '')
-                        title = episode.get('title', '未知标题')
-                        long_title = episode.get('long_title', '')
-                        if long_title:
-                            title = f'{title} - {long_title}'
-                        if bvid:
-                            all_videos.append({
-                                'title': title,
-                                'bvid': bvid,
-                                'aid': episode.get('aid')
-                            })
-                
                 # 验证区间范围
                 if 1 <= start <= end <= len(all_videos):
-                    for i in range(start-1, end):
-                        video = all_videos[i]
+                    for video in all_videos[start-1:end]:
                         if video['bvid'] not in downloaded_videos:
                             selected_videos.append(video)
                         else:
@@ -239,8 +318,8 @@ class BiliDown2Text:
             return self.process_collection(data)
         else:
             # 处理单个视频
-            bv_match = re.search(self.BV_PATTERN, url)
-            av_match = re.search(self.AV_PATTERN, url, re.I)
+            bv_match = self.BV_PATTERN.search(url)
+            av_match = self.AV_PATTERN.search(url)
             
             if bv_match:
                 bvid = f'BV{bv_match.group(1)}'
@@ -253,9 +332,7 @@ class BiliDown2Text:
                 return []
                 
             try:
-                headers = self.config['bilibili']['headers']
-                cookies = self.config['bilibili']['cookies']
-                response = requests.get(api_url, headers=headers, cookies=cookies)
+                response = self.session.get(api_url)
                 data = response.json()
                 
                 if data['code'] == 0:
@@ -282,113 +359,85 @@ class BiliDown2Text:
             })
         return videos
 
-    def download_video(self, video_info):
+    def check_video(self, video_info) -> bool:
+        """通过API确认视频信息可获取"""
+        api_url = f'https://api.bilibili.com/x/web-interface/view?bvid={video_info["bvid"]}'
+        try:
+            response = self.session.get(api_url)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            print(f"获取视频信息时发生错误：{str(e)}")
+            return False
+        
+        if data.get('code') == 0 and 'data' in data:
+            return True
+        print(f'获取视频信息失败：{data.get("message", "未知错误")}')
+        return False
+
+    def download_video(self, video_info, root: Path):
         title = video_info['title']
         video_id = video_info['bvid']
         
-        # 创建目录结构
-        base_dir = f"bilibili_video/{title}"
-        video_dir = f"{base_dir}/video"
-        os.makedirs(video_dir, exist_ok=True)
-        
-        video_path = f"{video_dir}/{video_id}.mp4"
-        if os.path.exists(video_path):
+        video_dir = root / 'video'
+        video_path = video_dir / f"{video_id}.mp4"
+        if video_path.exists():
             print(f"视频已存在：{video_path}")
             return video_path
 
-        # 获取视频信息
-        headers = self.config['bilibili']['headers']
-        cookies = self.config['bilibili']['cookies']
-        
-        api_url = f'https://api.bilibili.com/x/web-interface/view?bvid={video_id}'
+        # 使用you-get下载视频
+        video_url = f'https://www.bilibili.com/video/{video_id}'
+        sys.argv = ['you-get', '-o', str(video_dir), '--output-filename', video_id, video_url]
         try:
-            response = requests.get(api_url, headers=headers, cookies=cookies)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data['code'] == 0 and 'data' in data:
-                # 使用you-get下载视频
-                video_url = f'https://www.bilibili.com/video/{video_id}'
-                sys.argv = ['you-get', '-o', video_dir, '--output-filename', video_id, video_url]
-                try:
-                    from you_get import common as you_get
-                    you_get.main()
-                except Exception as e:
-                    print(f"下载视频时发生错误：{str(e)}")
-                    return None
-            else:
-                print(f'获取视频信息失败：{data.get("message", "未知错误")}')
-                return None
-        except Exception as e:
-            print(f"获取视频信息时发生错误：{str(e)}")
+            from you_get import common as you_get
+            you_get.main()
+        except (Exception, SystemExit) as e:
+            # you-get下载失败时会调用sys.exit，只让当前视频失败
+            print(f"下载视频时发生错误：{str(e)}")
             return None
         
         # 检查下载后的文件是否存在，可能文件名与预期不同
-        if not os.path.exists(video_path):
+        if not video_path.exists():
             # 查找可能的文件
-            files = os.listdir(video_dir)
-            for file in files:
-                if file.endswith('.mp4') and (video_id in file or title in file):
+            for src_path in video_dir.glob('*.mp4'):
+                if video_id in src_path.name or title in src_path.name:
                     # 找到匹配的文件，重命名为预期的文件名
-                    src_path = os.path.join(video_dir, file)
-                    os.rename(src_path, video_path)
+                    src_path.rename(video_path)
                     break
         
-        if os.path.exists(video_path):
+        if video_path.exists():
             print(f"视频下载完成：{video_path}")
             return video_path
         else:
             print("视频下载失败")
             return None
 
-    def extract_audio(self, video_path, title, video_id):
-        audio_dir = f"bilibili_video/{title}/conv"
-        os.makedirs(audio_dir, exist_ok=True)
-        
-        audio_path = f"{audio_dir}/{video_id}.mp3"
-        if os.path.exists(audio_path):
-            print(f"音频已存在：{audio_path}")
-            return audio_path
-        
-        # 使用ffmpeg提取音频，不输出日志
-        stream = ffmpeg.input(video_path)
-        stream = ffmpeg.output(stream, audio_path, loglevel='quiet')
-        ffmpeg.run(stream)
-        
-        print(f"音频提取完成：{audio_path}")
-        return audio_path
+    def extract_audio(self, video_path):
+        """将视频音轨直接解码为16kHz单声道float32数组，不落盘"""
+        # 通过PyAV在进程内解码并重采样，无需启动ffmpeg子进程
+        audio = decode_audio(str(video_path), sampling_rate=16000)
 
-    def split_audio(self, audio_path, title, video_id):
-        slice_dir = f"bilibili_video/{title}/slice/{video_id}"
-        os.makedirs(slice_dir, exist_ok=True)
-        
-        # 加载音频文件
-        audio = AudioSegment.from_mp3(audio_path)
-        chunk_length = 45000  # 45秒
-        chunks = []
-        
-        # 分割音频
-        for i, chunk_start in enumerate(range(0, len(audio), chunk_length)):
-            chunk = audio[chunk_start:chunk_start + chunk_length]
-            chunk_path = f"{slice_dir}/{i}.mp3"
-            chunk.export(chunk_path, format="mp3")
-            chunks.append(chunk_path)
-        
-        return chunks
+        print(f"音频提取完成：{len(audio) / 16000:.1f}秒")
+        return audio
 
-    def transcribe_audio(self, audio_chunks, title, video_id):
-        output_dir = f"bilibili_video/{title}/outputs"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        output_path = f"{output_dir}/{video_id}.txt"
+    def transcribe_audio(self, audio, title, video_id, root: Path, pipeline=None):
+        output_path = root / 'outputs' / f"{video_id}.txt"
         texts = []
         initial_prompt = f"以下是普通话的句子。这是一个关于{title}的视频。"
         
-        for chunk_path in tqdm(audio_chunks, desc="转换音频为文本"):
-            result = self.model.transcribe(chunk_path, initial_prompt=initial_prompt, fp16=False)
-            text = result["text"].strip()
-            texts.append(text)
-            print(f"转换结果：{text}")
+        # 整段音频交给批量管线，由其按语音片段切分并成批推理
+        segments, info = (pipeline or self.pipeline).transcribe(
+            audio,
+            initial_prompt=initial_prompt,
+            batch_size=self.batch_size,
+            **self.DECODE_OPTIONS,
+        )
+        with tqdm(total=round(info.duration), unit='s', desc="转换音频为文本") as pbar:
+            for segment in segments:
+                text = segment.text.strip()
+                texts.append(text)
+                print(f"转换结果：{text}")
+                pbar.update(max(0, round(segment.end) - pbar.n))
         
         # 保存文本文件
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -397,6 +446,35 @@ class BiliDown2Text:
         print(f"文本转换完成：{output_path}")
         return output_path
 
+    def _extract_worker(self, audio_queue, video, root, video_path):
+        """提取音频并放入转写队列，队列已满时阻塞等待"""
+        try:
+            audio = self.extract_audio(video_path)
+        except Exception as e:
+            print(f"提取音频时发生错误：{str(e)}")
+            return
+        audio_queue.put((video, root, audio))
+
+    def _transcribe_worker(self, audio_queue, collection_id):
+        """转写线程：依次从队列中取出音频送入模型，收到None时退出"""
+        # 每个线程使用独立的管线，推理由模型分派到空闲的GPU
+        pipeline = BatchedInferencePipeline(model=self.model)
+        while True:
+            item = audio_queue.get()
+            if item is None:
+                break
+            video, root, audio = item
+            print(f"\n处理视频：{video['title']}")
+            try:
+                self.transcribe_audio(audio, video['title'], video['bvid'], root, pipeline)
+            except Exception as e:
+                print(f"转换文本时发生错误：{str(e)}")
+                continue
+
+            # 更新进度记录
+            if collection_id:
+                self._save_progress(collection_id, video['bvid'])
+
     def process_video(self, url):
         # 获取视频信息
         videos = self.extract_video_info(url)
@@ -407,37 +485,65 @@ class BiliDown2Text:
         # 获取合集ID（如果是合集的话）
         is_collection, data = self.check_collection(url)
         collection_id = data.get('videoData', {}).get('bvid', '') if is_collection else ''
-        downloaded_videos = self._load_progress(collection_id) if collection_id else set()
         
+        pending = []
         for video in videos:
-            print(f"\n处理视频：{video['title']}")
-            
+            # 每个视频的目录只构建一次，传给后续各步骤
+            root = Path(self.base_dir) / video['title']
             # 检查文本文件是否已存在
-            output_dir = f"bilibili_video/{video['title']}/outputs"
-            output_path = f"{output_dir}/{video['bvid']}.txt"
-            if os.path.exists(output_path):
+            output_path = root / 'outputs' / f"{video['bvid']}.txt"
+            if output_path.exists():
                 print(f"文本文件已存在：{output_path}，跳过处理")
                 continue
-            
-            # 下载视频
-            video_path = self.download_video(video)
-            if not video_path:
-                print("视频下载失败")
-                continue
-            
-            # 提取音频
-            audio_path = self.extract_audio(video_path, video['title'], video['bvid'])
-            
-            # 分割音频
-            audio_chunks = self.split_audio(audio_path, video['title'], video['bvid'])
-            
-            # 转换为文本
-            self.transcribe_audio(audio_chunks, video['title'], video['bvid'])
-            
-            # 更新进度记录
-            if collection_id:
-                downloaded_videos.add(video['bvid'])
-                self._save_progress(collection_id, downloaded_videos)
+            pending.append((video, root))
+        
+        # 只需校验尚未下载的视频，并发获取视频信息，共用会话的连接池
+        to_check = [video for video, root in pending if not (root / 'video' / f"{video['bvid']}.mp4").exists()]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            unavailable = {video['bvid'] for video, ok in zip(to_check, pool.map(self.check_video, to_check)) if not ok}
+        pending = [(video, root) for video, root in pending if video['bvid'] not in unavailable]
+        # 过滤后再创建目录，避免为不可用的视频留下空目录
+        for _, root in pending:
+            (root / 'video').mkdir(parents=True, exist_ok=True)
+            (root / 'outputs').mkdir(exist_ok=True)
+        if not pending:
+            return
+        
+        # 确认有待处理的视频后再预热模型
+        self.warmup()
+        
+        # 下载、提取音频、转写三级流水线：第k个视频转写时，后续视频同时下载和解码
+        # 每张GPU对应一个转写线程，共同消费同一个队列
+        audio_queue = queue.Queue(maxsize=self.num_workers + 1)
+        transcribers = [
+            threading.Thread(target=self._transcribe_worker, args=(audio_queue, collection_id))
+            for _ in range(self.num_workers)
+        ]
+        for transcriber in transcribers:
+            transcriber.start()
+        
+        try:
+            # you-get通过sys.argv和模块级全局变量传参，下载只能串行进行
+            with ThreadPoolExecutor(max_workers=1) as download_pool, ThreadPoolExecutor(max_workers=1) as extract_pool:
+                downloads = [(video, root, download_pool.submit(self.download_video, video, root)) for video, root in pending]
+                try:
+                    for video, root, future in downloads:
+                        video_path = future.result()
+                        if not video_path:
+                            print(f"视频下载失败：{video['title']}")
+                            continue
+                        extract_pool.submit(self._extract_worker, audio_queue, video, root, video_path)
+                except BaseException:
+                    # 异常或Ctrl-C时取消尚未开始的下载和提取，不再继续处理剩余视频
+                    download_pool.shutdown(wait=False, cancel_futures=True)
+                    extract_pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+        finally:
+            # 无论下载阶段是否异常退出，都要通知转写线程结束，否则进程会一直阻塞
+            for _ in transcribers:
+                audio_queue.put(None)
+            for transcriber in transcribers:
+                transcriber.join()
 
 def main():
     if len(sys.argv) != 2: